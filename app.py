@@ -21,6 +21,7 @@ import joblib
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from types import MappingProxyType
 from src.scraper_selenium import scrape_olx_listings
  
 # Cache scraper results to avoid repeated downloads during interactive use
@@ -34,13 +35,57 @@ def cached_scrape(model_name: str, pages: int = 1, headless: bool = True, wait:
 
 # --- Model load (robust) ---
 MODEL_PATH = Path("models/wheel_deal_pipeline.pkl")
+
+
+# One shared model per worker process, across sessions and reruns
+@st.cache_resource(show_spinner=False)
+def load_model():
+    # No mmap_mode: src/train.py writes the pipeline lz4-compressed, which can't
+    # be memory-mapped; it is small and decompresses fast, so a plain load is fine
+    return joblib.load(MODEL_PATH)
+
+
 model = None
 load_error = None
 try:
-    model = joblib.load(MODEL_PATH)
+    model = load_model()
 except Exception as e:
     load_error = str(e)
 
+
+def _expected_cols(model):
+    """Input columns the pipeline's ColumnTransformer was fitted on ([] if unknown)."""
+    expected_cols = []
+    try:
+        if model is not None and hasattr(model, "named_steps") and "preproc" in model.named_steps:
+            ct = model.named_steps["preproc"]
+            for name, transformer, cols in getattr(ct, "transformers_", ct.transformers):
+                if name == "remainder":
+                    continue
+                if isinstance(cols, (list, tuple, np.ndarray)):
+                    expected_cols.extend(list(cols))
+                elif isinstance(cols, str):
+                    expected_cols.append(cols)
+    except Exception:
+        expected_cols = []
+    return expected_cols
+
+
+# Values used for features the form doesn't ask for
+_CAT_DEFAULTS = MappingProxyType({
+    "seller_type": "individual",
+    "brand": "other",
+    "transmission_type": "manual",
+    "model": "unknown",
+    "fuel_type": "petrol",
+})
+_NUM_DEFAULTS = MappingProxyType({"vehicle_age": 5, "km_driven": 20000, "mileage": 18.0,
+                                  "engine": 1200, "max_power": 80.0, "seats": 5})
+_FEATURE_DEFAULTS = MappingProxyType({**_NUM_DEFAULTS, **_CAT_DEFAULTS})
+
+# Fixed for the lifetime of the loaded model, so compute once rather than per prediction
+EXPECTED_COLS = _expected_cols(model) or list(_NUM_DEFAULTS) + list(_CAT_DEFAULTS)
+
 # --- Page config ---
 st.set_page_config(page_title="Wheel Deal 🚘", page_icon="🚗", layout="centered")
 
@@ -120,52 +165,38 @@ st.markdown("<p class='subtitle'>A modern, friendly car price estimator — ente
 st.markdown("<h3 style='text-align:center; margin-top:24px;'>🚗 Choose Your Mode</h3>", unsafe_allow_html=True)
 mode = st.radio("Mode", ["Single Car Estimate", "Compare Two Cars"], horizontal=True)
 
-def predict_price(inputs):
-    """Build a DataFrame with the features the pipeline expects and predict."""
-    categorical_defaults = {
-        "seller_type": "individual",
-        "brand": "other",
-        "transmission_type": "manual",
-        "model": "unknown",
-        "fuel_type": "petrol",
-    }
-    numeric_defaults = {"vehicle_age": 5, "km_driven": 20000, "mileage": 18.0,
-                        "engine": 1200, "max_power": 80.0, "seats": 5}
-    
-    expected_cols = []
-    try:
-        if model is not None and hasattr(model, "named_steps") and "preproc" in model.named_steps:
-            ct = model.named_steps["preproc"]
-            for name, transformer, cols in getattr(ct, "transformers_", ct.transformers):
-                if name == "remainder":
-                    continue
-                if isinstance(cols, (list, tuple, np.ndarray)):
-                    expected_cols.extend(list(cols))
-                elif isinstance(cols, str):
-                    expected_cols.append(cols)
-    except Exception:
-        expected_cols = []
-    
-    if not expected_cols:
-        expected_cols = list(numeric_defaults.keys()) + list(categorical_defaults.keys())
-    
-    row = {}
-    for col in expected_cols:
-        if col in inputs:
-            row[col] = inputs[col]
-        elif col in numeric_defaults:
-            row[col] = inputs.get(col, numeric_defaults[col])
-        elif col in categorical_defaults:
-            row[col] = inputs.get(col, categorical_defaults[col])
-        else:
-            row[col] = inputs.get(col, "missing")
+def predict_prices(inputs_list):
+    """Predict prices for several cars with a single `model.predict` call.
+
+    Builds one DataFrame row per inputs dict (filling the features the pipeline
+    expects from defaults) and returns a numpy array of non-negative prices.
+    """
+    columns = {col: [] for col in EXPECTED_COLS}
+    for inputs in inputs_list:
+        for col in EXPECTED_COLS:
+            columns[col].append(inputs.get(col, _FEATURE_DEFAULTS.get(col, "missing")))
     
-    df = pd.DataFrame([row])
-    pred_log = model.predict(df)[0]
-    if isinstance(pred_log, (list, tuple, np.ndarray)):
-        pred_log = float(pred_log[0])
-    price = np.expm1(pred_log)
-    return max(price, 0)
+    # Column-oriented construction skips pandas' per-record dict inference.
+    # The ColumnTransformer selects inputs by name, so it must stay a DataFrame.
+    df = pd.DataFrame(columns, columns=EXPECTED_COLS)
+    pred_log = np.asarray(model.predict(df), dtype=float).reshape(len(df), -1)[:, 0]
+    return np.maximum(np.expm1(pred_log), 0)
+
+
+# Streamlit reruns the whole script on every interaction; cache on the frozen inputs
+@st.cache_data(max_entries=256)
+def _predict_cached(frozen_inputs_list: tuple) -> tuple:
+    prices = predict_prices([dict(frozen) for frozen in frozen_inputs_list])
+    return tuple(float(p) for p in prices)
+
+
+def _freeze(inputs):
+    return tuple(sorted(inputs.items()))
+
+
+def predict_price(inputs):
+    """Predict the price of a single car (cached, see `predict_prices`)."""
+    return _predict_cached((_freeze(inputs),))[0]
 
 # --- SINGLE CAR ESTIMATE ---
 if mode == "Single Car Estimate":
@@ -309,10 +340,12 @@ else:
 
     if st.button("⚖️ Compare Prices"):
         with st.spinner("Predicting both cars..."):
-            price_a = predict_price(dict(vehicle_age=a_age, km_driven=a_km, mileage=a_mileage,
-                                         engine=a_engine, max_power=a_power, seats=a_seats))
-            price_b = predict_price(dict(vehicle_age=b_age, km_driven=b_km, mileage=b_mileage,
-                                         engine=b_engine, max_power=b_power, seats=b_seats))
+            price_a, price_b = _predict_cached((
+                _freeze(dict(vehicle_age=a_age, km_driven=a_km, mileage=a_mileage,
+                             engine=a_engine, max_power=a_power, seats=a_seats)),
+                _freeze(dict(vehicle_age=b_age, km_driven=b_km, mileage=b_mileage,
+                             engine=b_engine, max_power=b_power, seats=b_seats)),
+            ))
 
         diff = price_a - price_b
         better = "Car A" if diff > 0 else "Car B"
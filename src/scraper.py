@@ -1,12 +1,35 @@
 # src/scraper.py
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import pandas as pd
 import time
 import re
 from urllib.parse import urlencode
 from tqdm import tqdm
 
+# Regexes used in the parse loop, compiled once
+_NON_DIGITS = re.compile(r"[^\d]")
+_CONTAINER_LI_CLASS = re.compile(r".*listing.*|.*result.*|.*item.*", re.I)
+_CONTAINER_DIV_CLASS = re.compile(r".*listing.*|.*result.*|.*card.*|.*EIR5N.*", re.I)
+# price, km and year in one scan; the first match of each group wins
+_FIELDS_RE = re.compile(
+    r"(?P<price>(?:₹|\bINR\b|\bRs\.?)\s*\d[\d,]*)"
+    r"|(?P<km>\d[\d,]*)\s*kms?\b"
+    r"|(?P<year>\b(?:19|20)\d{2}\b)",
+    re.I,
+)
+
+# Listing containers: exact selectors tried in order, then class-name patterns
+_CONTAINER_SELECTORS = [
+    "div[data-aut-id='itemBox']",
+    "li[data-aut-id='itemBox']",
+    "article",
+]
+_CONTAINER_CLASS_PATTERNS = [
+    ("li[class]", _CONTAINER_LI_CLASS),
+    ("div[class]", _CONTAINER_DIV_CLASS),
+]
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                   "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
@@ -15,7 +38,7 @@ HEADERS = {
 def clean_price(text):
     if not text or not isinstance(text, str):
         return None
-    t = re.sub(r"[^\d]", "", text)
+    t = _NON_DIGITS.sub("", text)
     try:
         return int(t) if t else None
     except:
@@ -24,7 +47,7 @@ def clean_price(text):
 def clean_km(text):
     if not text or not isinstance(text, str):
         return None
-    t = re.sub(r"[^\d]", "", text)
+    t = _NON_DIGITS.sub("", text)
     try:
         return int(t) if t else None
     except:
@@ -33,7 +56,10 @@ def clean_km(text):
 import requests
 import random
 import time
-from urllib.parse import urlencode
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+from requests.adapters import HTTPAdapter
 
 # add or replace your HEADERS constant with this:
 HEADERS = {
@@ -45,21 +71,63 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
     "Connection": "keep-alive",
+    "Accept-Encoding": "gzip, deflate",
 }
 
+# Shared session: keeps TCP/TLS connections alive between page fetches.
+# No adapter-level retries: fetch_html's loop is the only retry layer, so a
+# hanging host costs max_retries timeouts rather than max_retries x urllib3's.
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# Hosts are only held back after they push back with one of these statuses
+_THROTTLE_STATUSES = {429, 503}
+_MAX_BACKOFF = 60.0
+_host_not_before = {}   # netloc -> time.monotonic() deadline set by the last 429/503
+
+
+def _wait_for_host(netloc):
+    """Sleep until the back-off deadline a throttling host asked for (if any) has passed."""
+    remaining = _host_not_before.get(netloc, 0.0) - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def _backoff_seconds(response, attempt):
+    """Delay requested by a 429/503 response: Retry-After if present, else exponential."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), _MAX_BACKOFF)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return min(max((when - datetime.now(timezone.utc)).total_seconds(), 0.0), _MAX_BACKOFF)
+            except (TypeError, ValueError):
+                pass
+    return min(2.0 ** attempt, _MAX_BACKOFF)
+
+
 def fetch_html(url, params=None, timeout=15, max_retries=3):
     """
-    Fetch a webpage with retry, random delay, and realistic browser headers.
+    Fetch a webpage with retry and realistic browser headers.
+    Requests go through a shared keep-alive session with compression enabled.
+    There is no delay on the happy path; a host that answers 429/503 is left
+    alone until its Retry-After (or an exponential back-off) has elapsed, after
+    which requests to it go out at full speed again.
     """
     if params:
         url = url + "?" + urlencode(params)
+    netloc = urlsplit(url).netloc
 
     for attempt in range(max_retries):
         try:
-            # random short delay to mimic human browsing
-            time.sleep(random.uniform(1.0, 2.5))
+            _wait_for_host(netloc)
 
-            r = requests.get(url, headers=HEADERS, timeout=timeout)
+            r = _SESSION.get(url, timeout=timeout)
             r.raise_for_status()
 
             # check if response looks valid
@@ -70,87 +138,103 @@ def fetch_html(url, params=None, timeout=15, max_retries=3):
 
         except Exception as e:
             print(f"⚠️ Attempt {attempt+1}/{max_retries} failed for {url}: {e}")
+            response = getattr(e, "response", None)
+            throttled = response is not None and response.status_code in _THROTTLE_STATUSES
+            if throttled:
+                # server pushed back: hold every request to this host (the next
+                # retry, or the caller's next page) until the deadline;
+                # _wait_for_host sleeps it off
+                deadline = time.monotonic() + _backoff_seconds(response, attempt)
+                _host_not_before[netloc] = max(_host_not_before.get(netloc, 0.0), deadline)
             if attempt < max_retries - 1:
-                # wait longer before next retry
-                time.sleep(random.uniform(2, 5))
+                if not throttled:
+                    # wait longer before next retry
+                    time.sleep(random.uniform(2, 5))
                 continue
             else:
                 print("❌ Giving up on", url)
                 return None
 
 
+def _find_descendant(node, selector):
+    """First match strictly below `node` (lexbor's css() also matches the node itself)."""
+    return next((n for n in node.css(selector) if n.mem_id != node.mem_id), None)
+
+
+def _to_int_column(raw):
+    """Vectorised clean_price/clean_km: strip non-digits, parse as Int64, 0 -> missing.
+
+    Digit runs longer than 18 can't fit int64 and would make the cast raise for
+    the whole page, so they become missing too. Parsing straight into a nullable
+    dtype keeps large values exact (no float64 round trip).
+    """
+    digits = raw.str.replace(_NON_DIGITS, "", regex=True)
+    digits = digits.where(digits.str.len().between(1, 18))
+    values = pd.to_numeric(digits, errors="coerce", dtype_backend="numpy_nullable").astype("Int64")
+    return values.mask((values == 0).fillna(False))
+
+
 def parse_listings_from_html(html, site_hint=None):
     """
     Generic parser that attempts to extract title, price, kms, and some details.
     For best results, inspect the target site's HTML and adjust selectors below.
     """
-    soup = BeautifulSoup(html, "lxml")
+    tree = LexborHTMLParser(html)
     results = []
 
-    # Candidate listing containers (try several common patterns)
-    possible_containers = [
-        ("li", {"class": re.compile(r".*listing.*|.*result.*|.*item.*", re.I)}),
-        ("div", {"class": re.compile(r".*listing.*|.*result.*|.*card.*|.*EIR5N.*", re.I)}),
-        ("article", {}),
-        ("div", {"data-aut-id": "itemBox"})
-    ]
-
+    # Candidate listing containers, most specific (OLX) first. A cheap css_first
+    # probe avoids collecting full match lists for selectors that miss.
     containers = []
-    for tag, attrs in possible_containers:
-        found = soup.find_all(tag, attrs=attrs)
-        if found:
-            containers = found
+    for selector in _CONTAINER_SELECTORS:
+        if tree.css_first(selector) is not None:
+            containers = tree.css(selector)
             break
 
+    # last-ditch: class-name patterns, which have to test every li/div
+    if not containers:
+        for selector, pattern in _CONTAINER_CLASS_PATTERNS:
+            containers = [n for n in tree.css(selector)
+                          if pattern.search(n.attributes.get("class") or "")]
+            if containers:
+                break
+
     # fallback: find many <a> elements that look like listing links
     if not containers:
-        containers = soup.find_all("a", href=True)
-        containers = [c for c in containers if c.text.strip() and len(c.text.strip()) < 200][:200]
+        containers = tree.css("a[href]")
+        containers = [c for c in containers if 0 < len(c.text().strip()) < 200][:200]
 
     for c in containers:
-        text = c.get_text(" ", strip=True)
-
-        # try to find price inside container
-        price_candidates = c.find_all(text=re.compile(r"₹|\bINR\b|Rs\.|rs\.|\d{2,}"))
-        price = None
-        for pc in price_candidates:
-            val = clean_price(pc)
-            if val:
-                price = val
-                break
+        text = c.text(separator=" ", strip=True)
 
-        # kms candidate
-        km_candidates = c.find_all(text=re.compile(r"\d[\d,]*\s*km|\d[\d,]*\s*kms", re.I))
-        km_val = None
-        for kc in km_candidates:
-            val = clean_km(kc)
-            if val:
-                km_val = val
+        # one regex pass for price/km/year; price/km stay raw and are cleaned
+        # column-wise after the loop
+        fields = {}
+        for m in _FIELDS_RE.finditer(text):
+            fields.setdefault(m.lastgroup, m.group(m.lastgroup))
+            if len(fields) == 3:
                 break
 
         # title: try heading tags inside container then fallback to text snippet
         title = None
         for tag in ("h2", "h3", "h1", "a", "span", "div"):
-            t = c.find(tag)
-            if t and len(t.get_text(strip=True)) > 3:
-                title = t.get_text(strip=True)
+            t = _find_descendant(c, tag)
+            if t and len(t.text(strip=True)) > 3:
+                title = t.text(strip=True)
                 break
         if not title:
             title = (text[:120] + "...") if text else None
 
-        # attempt to find year using 4-digit pattern like 2015/2019
-        year_match = re.search(r"\b(19|20)\d{2}\b", text)
-        year = int(year_match.group(0)) if year_match else None
-
         results.append({
             "title": title,
-            "price": price,
-            "km": km_val,
-            "year": year,
-            "raw_text": text
+            "price_raw": fields.get("price"),
+            "km_raw": fields.get("km"),
+            "year": int(fields["year"]) if "year" in fields else None,
         })
 
-    return pd.DataFrame(results)
+    df = pd.DataFrame(results, columns=["title", "price_raw", "km_raw", "year"])
+    df.insert(1, "price", _to_int_column(df.pop("price_raw")))
+    df.insert(2, "km", _to_int_column(df.pop("km_raw")))
+    return df
 
 def scrape_search_results(base_search_url, query_params=None, pages=1, delay=1.0):
     """
@@ -179,7 +263,7 @@ def scrape_search_results(base_search_url, query_params=None, pages=1, delay=1.0
         combined = combined.dropna(subset=["price"]).reset_index(drop=True)
         return combined
     else:
-        return pd.DataFrame(columns=["title", "price", "km", "year", "raw_text"])
+        return pd.DataFrame(columns=["title", "price", "km", "year"])
 
 
 # Example helpers for specific sites (skeletons you must adapt after inspecting HTML)
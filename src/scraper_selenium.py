@@ -1,22 +1,74 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import WebDriverException, NoSuchElementException
+from selenium.common.exceptions import (
+    WebDriverException, NoSuchElementException, TimeoutException, StaleElementReferenceException,
+    JavascriptException, InvalidSessionIdException, NoSuchWindowException,
+)
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+import atexit
+import os
+import threading
 import re
+import urllib3
 from urllib.parse import urljoin
 
+# One Chrome instance per headless flag, reused across scrape calls.
+# Chrome start-up dominates scrape latency, so we pay it once per process.
+_DRIVERS = {}
+_DRIVER_LOCK = threading.Lock()
+# Errors meaning the browser session itself is gone (not just one bad page);
+# only these make us throw the cached driver away
+_SESSION_GONE = (InvalidSessionIdException, NoSuchWindowException,
+                 ConnectionError, urllib3.exceptions.HTTPError)
+# Resolved chromedriver binary; webdriver-manager's lookup does network I/O, so do it once
+_DRIVER_PATH = None
+
+_DIGITS_RUN = re.compile(r"\d+")
+
+# Listing container selectors (OLX changes their structure frequently)
+_ITEM_SELECTORS = [
+    "ul > li[data-aut-id]",
+    "li.EIR5N",
+    "div[data-aut-id='itemBox']",
+    "li._1DNjI",
+    "div._2ZxqI"
+]
+
+# Per-item field selectors, tried in order
+_TITLE_SELECTORS = ["h2", "span[data-aut-id='itemTitle']", "div._2tW1I"]
+_PRICE_SELECTORS = ["span._2xKfz", "span[data-aut-id='itemPrice']", "div._1zgtX"]
+_LOCATION_SELECTORS = ["p._2TVI3", "span[data-aut-id='item-location']", "div._1KOFM"]
+
+# Extracts all fields for the given item elements in-browser, in a single call.
+# Returns [{text, title, prices, href, location}, ...] in the same order as the items.
+_EXTRACT_JS = """
+const [items, titleSels, priceSels, locationSels] = arguments;
+const texts = (el, sels) => sels
+    .map(s => el.querySelector(s))
+    .map(n => n ? n.innerText.trim() : "")
+    .filter(t => t);
+return items.map(el => {
+    const a = el.querySelector("a");
+    return {
+        text: el.innerText,
+        title: texts(el, titleSels)[0] || null,
+        prices: texts(el, priceSels),
+        href: a ? a.href : null,
+        location: texts(el, locationSels)[0] || null,
+    };
+});
+"""
+
 
 def _parse_price(text):
     """Extract numeric price from text like '₹ 3,45,000' or '3,45,000'. Returns int or None."""
     if not text:
         return None
     # Remove currency symbols and commas, extract digits
-    nums = re.findall(r"\d+", text.replace(',', ''))
+    nums = _DIGITS_RUN.findall(text.replace(',', ''))
     if not nums:
         return None
     try:
@@ -25,17 +77,13 @@ def _parse_price(text):
         return None
 
 
+def _find_items(driver):
+    """WebDriverWait condition: (selector, elements) for the first selector that matches."""
+    return next(((sel, els) for sel in _ITEM_SELECTORS
+                 if (els := driver.find_elements(By.CSS_SELECTOR, sel))), None)
 
 
-
-def scrape_olx_listings(model_name="swift", pages=1, headless=True, wait=3):
-    """Scrape OLX listings for a model_name. Returns list of dicts with basic fields.
-
-    Notes:
-    - Uses webdriver-manager to install Chrome driver if needed.
-    - This is a simple scraper; OLX layout may change so selectors may need updates.
-    - Keep `pages` small for interactive use (1-3 pages).
-    """
+def _build_options(headless):
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -45,141 +93,216 @@ def scrape_olx_listings(model_name="swift", pages=1, headless=True, wait=3):
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    # We only read text fields, so skip images/notifications and background services
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-sync")
+    options.add_argument("--disable-translate")
+    options.add_argument("--metrics-recording-only")
+    options.add_argument("--mute-audio")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.managed_default_content_settings.stylesheets": 1,
+    })
+    # Return from driver.get() at DOMContentLoaded; we wait for listings explicitly
+    options.page_load_strategy = "eager"
+    return options
+
+
+def _driver_path():
+    """Path to chromedriver: $CHROMEDRIVER_PATH if set (e.g. preinstalled on Streamlit Cloud),
+    else whatever webdriver-manager installs. Resolved once per process."""
+    global _DRIVER_PATH
+    if _DRIVER_PATH is None:
+        _DRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH") or ChromeDriverManager().install()
+    return _DRIVER_PATH
 
+
+def _get_driver(headless):
+    """Return the cached driver for `headless`, starting Chrome on first use.
+
+    Must be called with `_DRIVER_LOCK` held.
+    """
+    driver = _DRIVERS.get(headless)
+    if driver is not None:
+        return driver
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+        service = Service(_driver_path())
+        driver = webdriver.Chrome(service=service, options=_build_options(headless))
     except WebDriverException as e:
         raise RuntimeError("Could not start Chrome webdriver. Ensure Chrome is installed and chromedriver is available") from e
+    _DRIVERS[headless] = driver
+    return driver
 
-    all_listings = []
+
+def _discard_driver(headless):
+    """Quit and forget a cached driver (e.g. after the browser crashed)."""
+    driver = _DRIVERS.pop(headless, None)
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+@atexit.register
+def _quit_drivers():
+    for headless in list(_DRIVERS):
+        _discard_driver(headless)
+
+
+def scrape_olx_listings(model_name="swift", pages=1, headless=True, wait=3):
+    """Scrape OLX listings for a model_name. Returns list of dicts with basic fields.
+
+    Notes:
+    - Uses webdriver-manager to install Chrome driver if needed.
+    - The browser is started once and reused by later calls; it is shut down at exit.
+    - This is a simple scraper; OLX layout may change so selectors may need updates.
+    - Keep `pages` small for interactive use (1-3 pages).
+    """
+    with _DRIVER_LOCK:
+        return _scrape_with_driver(model_name, pages, headless, wait)
+
+
+def _open_page_tabs(driver, urls):
+    """Start loading every url at once: the first in the current tab, the rest in new tabs.
+
+    window.open() returns immediately, so the pages download in parallel inside
+    the browser. Returns the window handle for each url, in order.
+    """
+    handles = [driver.current_window_handle]
+    driver.get(urls[0])
+    for url in urls[1:]:
+        known = set(driver.window_handles)
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+        new = [h for h in driver.window_handles if h not in known]
+        handles.append(new[0])
+    return handles
+
+
+def _close_extra_tabs(driver, main_handle):
+    for handle in driver.window_handles:
+        if handle != main_handle:
+            driver.switch_to.window(handle)
+            driver.close()
+    driver.switch_to.window(main_handle)
+
+
+def _scrape_page(driver, page, headless, wait):
+    """Extract listings from the page loaded in the driver's current tab."""
     base = "https://www.olx.in"
+    listings = []
+
+    # The list can still be rendering when the first selector hits (eager page
+    # load), so items may go stale before the extraction script runs: re-poll once.
+    for attempt in range(2):
+        # Wait until any of the listing selectors matches (no fixed sleep)
+        items = []
+        try:
+            selector, items = WebDriverWait(driver, max(10, wait * 2)).until(_find_items)
+            print(f"✅ Found {len(items)} items using selector: {selector}")
+        except TimeoutException:
+            print("⚠️ Timeout waiting for listings to load")
+
+        if not items:
+            print(f"⚠️ Page {page}: No items found with any selector")
+            # Save page source for debugging
+            if not headless:
+                print("Page title:", driver.title)
+            return listings
+
+        print(f"✅ Page {page}: Processing {len(items)} items")
+
+        # Pull every field in one round-trip instead of ~8 find_element calls per item
+        try:
+            rows = driver.execute_script(
+                _EXTRACT_JS, items, _TITLE_SELECTORS, _PRICE_SELECTORS, _LOCATION_SELECTORS
+            )
+            break
+        except (StaleElementReferenceException, JavascriptException) as e:
+            print(f"⚠️ Page {page}: Listings changed while reading them ({type(e).__name__})")
+    else:
+        print(f"⚠️ Page {page}: Skipping page, listings kept changing")
+        return listings
+
+    for idx, row in enumerate(rows):
+        try:
+            text = (row.get("text") or "").strip()
+            if not text:
+                continue
+
+            title = row.get("title")
+
+            price = None
+            for price_text in row.get("prices") or []:
+                price = _parse_price(price_text)
+                if price:
+                    break
+
+            # Fallback: search for price in text
+            if not price:
+                price = _parse_price(text)
+
+            href = row.get("href")
+            if href and href.startswith('/'):
+                href = urljoin(base, href)
+
+            location = row.get("location")
+
+            # Only add if we have at least a title or price
+            if title or price:
+                listings.append({
+                    "title": title or text.split('\n')[0] if text else "Unknown",
+                    "price": price,
+                    "url": href,
+                    "meta": location or "Location not specified",
+                    "raw": text,
+                })
+
+        except Exception as e:
+            print(f"Error processing item {idx}: {e}")
+            continue
+
+    return listings
+
+
+def _scrape_with_driver(model_name, pages, headless, wait):
+    driver = _get_driver(headless)
+    all_listings = []
+    main_handle = None
 
     try:
-        for page in range(1, pages + 1):
-            # URL encode the query properly
-            query = model_name.replace(' ', '-')
-            url = f"https://www.olx.in/items/q-{query}?page={page}"
+        main_handle = driver.current_window_handle
+        # URL encode the query properly
+        query = model_name.replace(' ', '-')
+        urls = [f"https://www.olx.in/items/q-{query}?page={page}" for page in range(1, pages + 1)]
+        for url in urls:
             print(f"🌐 Fetching {url} ...")
-            driver.get(url)
-            
-            # Wait for content to load
-            time.sleep(wait)
-            
-            # Try to wait for listings to appear
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "li[data-aut-id]"))
-                )
-            except:
-                print("⚠️ Timeout waiting for listings to load")
-
-            # Try multiple selectors (OLX changes their structure frequently)
-            items = []
-            selectors = [
-                "ul > li[data-aut-id]",
-                "li.EIR5N",
-                "div[data-aut-id='itemBox']",
-                "li._1DNjI",
-                "div._2ZxqI"
-            ]
-            
-            for selector in selectors:
-                try:
-                    items = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if items:
-                        print(f"✅ Found {len(items)} items using selector: {selector}")
-                        break
-                except Exception as e:
-                    continue
-            
-            if not items:
-                print(f"⚠️ Page {page}: No items found with any selector")
-                # Save page source for debugging
-                if not headless:
-                    print("Page title:", driver.title)
-                continue
+        handles = _open_page_tabs(driver, urls)
 
-            print(f"✅ Page {page}: Processing {len(items)} items")
-
-            for idx, it in enumerate(items):
-                try:
-                    # Get all text from the item
-                    text = it.text.strip()
-                    if not text:
-                        continue
-                    
-                    # Extract title - try multiple selectors
-                    title = None
-                    title_selectors = ["h2", "span[data-aut-id='itemTitle']", "div._2tW1I"]
-                    for sel in title_selectors:
-                        try:
-                            title_el = it.find_element(By.CSS_SELECTOR, sel)
-                            title = title_el.text.strip()
-                            if title:
-                                break
-                        except:
-                            continue
-                    
-                    # Extract price - try multiple selectors
-                    price = None
-                    price_selectors = ["span._2xKfz", "span[data-aut-id='itemPrice']", "div._1zgtX"]
-                    for sel in price_selectors:
-                        try:
-                            price_el = it.find_element(By.CSS_SELECTOR, sel)
-                            price = _parse_price(price_el.text)
-                            if price:
-                                break
-                        except:
-                            continue
-                    
-                    # Fallback: search for price in text
-                    if not price:
-                        price = _parse_price(text)
-                    
-                    # Extract link
-                    href = None
-                    try:
-                        a = it.find_element(By.CSS_SELECTOR, "a")
-                        href = a.get_attribute("href")
-                        if href and href.startswith('/'):
-                            href = urljoin(base, href)
-                    except:
-                        pass
-                    
-                    # Extract location
-                    location = None
-                    location_selectors = ["p._2TVI3", "span[data-aut-id='item-location']", "div._1KOFM"]
-                    for sel in location_selectors:
-                        try:
-                            loc_el = it.find_element(By.CSS_SELECTOR, sel)
-                            location = loc_el.text.strip()
-                            if location:
-                                break
-                        except:
-                            continue
-                    
-                    # Only add if we have at least a title or price
-                    if title or price:
-                        all_listings.append({
-                            "title": title or text.split('\n')[0] if text else "Unknown",
-                            "price": price,
-                            "url": href,
-                            "meta": location or "Location not specified",
-                            "raw": text,
-                        })
-                        
-                except Exception as e:
-                    print(f"Error processing item {idx}: {e}")
-                    continue
-            
+        for page, handle in enumerate(handles, start=1):
+            driver.switch_to.window(handle)
+            all_listings.extend(_scrape_page(driver, page, headless, wait))
             print(f"✅ Page {page}: Extracted {len(all_listings)} total listings so far")
 
+    except _SESSION_GONE as e:
+        print(f"❌ Scraping error: {e}")
+        # The browser is dead; start a fresh one on the next call.
+        _discard_driver(headless)
+        raise
     except Exception as e:
         print(f"❌ Scraping error: {e}")
         raise
     finally:
-        driver.quit()
+        if headless in _DRIVERS:
+            try:
+                if main_handle:
+                    _close_extra_tabs(driver, main_handle)
+                driver.delete_all_cookies()
+            except WebDriverException:
+                _discard_driver(headless)
 
     print(f"🎉 Total listings scraped: {len(all_listings)}")
     return all_listings